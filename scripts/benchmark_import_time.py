@@ -0,0 +1,141 @@
+"""Measure the plugin's import-time cost against a checked-in budget.
+
+Runs a fresh interpreter with ``python -X importtime`` that first imports the
+framework modules a Care worker has already loaded by the time plugins are
+imported (the "prelude"), then imports the plugin modules Django touches at
+boot. Only modules imported *after* the prelude are counted, so the total is
+what the plugin itself adds to worker startup.
+
+The budget lives in ``scripts/import_time_budget.json``::
+
+    {
+      "max_total_us": ...,          # median self time of everything the plugin pulls in
+      "runs": ...,                  # interpreters to spawn; the median is compared
+      "prelude": [...],             # modules imported before measuring
+      "modules": [...],             # plugin modules imported at boot
+      "forbidden": [...]            # module prefixes that must stay lazy
+    }
+
+The prelude must only list modules a Care worker is guaranteed to have
+loaded before plugin app configs are imported; otherwise it hides real cost.
+``django.db``, ``django.db.models.signals``, ``django.core.cache`` and
+``django.utils.timezone`` qualify because ``django.setup()`` loads them for
+the ``django.contrib.auth`` and ``django.contrib.sessions`` apps that Care
+installs. Check that claim before adding a module here; don't widen the
+prelude just to bring a new import back under budget.
+
+A forbidden module showing up at boot fails the check regardless of timing,
+since that is the regression the budget exists to catch.
+
+Run from the repo root::
+
+    python scripts/benchmark_import_time.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MARKER = "--token-display-import-start--"
+
+
+def _parse_importtime(stderr: str) -> list[tuple[int, int, str]]:
+    """Return ``(self_us, cumulative_us, module)`` for lines after the marker."""
+    _, _, measured = stderr.partition(MARKER)
+    rows = []
+    for line in measured.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|", 2)
+        rows.append((int(self_us), int(cumulative_us), module.rstrip()))
+    return rows
+
+
+def _run_once(prelude: list[str], modules: list[str]) -> list[tuple[int, int, str]]:
+    code = "\n".join(
+        [
+            "import sys",
+            *(f"import {name}" for name in prelude),
+            f"sys.stderr.write({MARKER!r} + '\\n')",
+            *(f"import {name}" for name in modules),
+        ]
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT / "src"), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import failed:\n{result.stderr[-2000:]}")
+    return _parse_importtime(result.stderr)
+
+
+def _is_forbidden(module: str, forbidden: list[str]) -> bool:
+    return any(module == prefix or module.startswith(f"{prefix}.") for prefix in forbidden)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--budget",
+        default=str(REPO_ROOT / "scripts" / "import_time_budget.json"),
+        help="Budget file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=None,
+        help="Number of interpreters to spawn (default: from the budget file)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="How many of the slowest modules to list (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    budget = json.loads(Path(args.budget).read_text())
+    runs = args.runs or budget.get("runs", 5)
+
+    totals = []
+    rows = []
+    for _ in range(runs):
+        try:
+            rows = _run_once(budget["prelude"], budget["modules"])
+        except RuntimeError as exc:
+            print(f"[import-time] {exc}", file=sys.stderr)
+            return 2
+        totals.append(sum(self_us for self_us, _, _ in rows))
+
+    median_us = int(statistics.median(totals))
+    max_us = budget["max_total_us"]
+    forbidden = sorted({m.strip() for _, _, m in rows if _is_forbidden(m.strip(), budget.get("forbidden", []))})
+
+    print(f"[import-time] {len(rows)} module(s) imported after the prelude")
+    for self_us, _, module in sorted(rows, reverse=True)[: args.top]:
+        print(f"  {self_us:>8} us  {module.strip()}")
+    print(f"[import-time] median of {runs} run(s): {median_us} us (budget {max_us} us)")
+
+    ok = True
+    if forbidden:
+        print(f"[import-time] FAIL: imported at boot: {', '.join(forbidden)}", file=sys.stderr)
+        ok = False
+    if median_us > max_us:
+        print(f"[import-time] FAIL: over budget by {median_us - max_us} us", file=sys.stderr)
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,20 +1,53 @@
+import threading
 from importlib import import_module
 
 from django.apps import AppConfig
 from django.conf import settings
-from django.urls import include, path
+from django.core.signals import request_started
+from django.db.models.signals import post_save
 from django.utils.translation import gettext_lazy as _
 
 PLUGIN_NAME = "token_display"
 
+_ROUTES_DISPATCH_UID = f"{PLUGIN_NAME}:register_routes"
+_TOKEN_SAVED_DISPATCH_UID = f"{PLUGIN_NAME}:token_saved"
+_routes_lock = threading.Lock()
+_routes_registered = False
+
+
+def register_routes(*args, **kwargs) -> None:
+    """
+    Append the plugin's non-API routes (SSR Pages) to the root URLconf.
+
+    Importing the root URLconf pulls in every app's views, so this runs on
+    the first request rather than at ``ready()`` time. It is idempotent and
+    may also be called directly by code that needs to ``reverse()`` a page
+    route before any request has been served.
+    """
+    global _routes_registered
+
+    with _routes_lock:
+        if _routes_registered:
+            return
+        from django.urls import clear_url_caches, include, path
+
+        urlconf = import_module(settings.ROOT_URLCONF)
+        urlconf.urlpatterns += [path(f"{PLUGIN_NAME}/", include(f"{PLUGIN_NAME}.pages"))]
+        # A resolver built before this point (e.g. by system checks) has
+        # already cached the old pattern list.
+        clear_url_caches()
+        _routes_registered = True
+        request_started.disconnect(dispatch_uid=_ROUTES_DISPATCH_UID)
+
 
 class TokenDisplayConfig(AppConfig):
     name = PLUGIN_NAME
     verbose_name = _("Token Display")
 
     def ready(self):
-        # include non-API routes (SSR Pages)
-        urlconf = import_module(settings.ROOT_URLCONF)
-        urlconf.urlpatterns += [
-            path(f"{PLUGIN_NAME}/", include(f"{PLUGIN_NAME}.pages"))
-        ]
+        request_started.connect(register_routes, dispatch_uid=_ROUTES_DISPATCH_UID)
+        # Log token calls for announcement catch-up. The lazy "app_label.Model"
+        # sender avoids importing Care's models here.
+        from token_display.events import on_token_saved
+
+        post_save.connect(on_token_saved, sender="emr.Token", dispatch_uid=_TOKEN_SAVED_DISPATCH_UID)
@@ -0,0 +1,200 @@
+"""
+Append-only log of token-call events per sub-queue.
+
+Each sub-queue has a monotonic sequence number in the Django cache. Calling a
+token increments it (atomically, via ``cache.incr``) and stores the event
+under its own key, so appends never race on a shared list. Only the latest
+``ANNOUNCEMENT_LOG_SIZE`` sequence numbers are ever read back, which makes the
+log a bounded ring; older events simply expire after ``ANNOUNCEMENT_LOG_TTL``.
+
+Display screens keep the last sequence number they announced per sub-queue
+(their cursor) and fetch only the events after it. A sequence number becomes
+visible (``incr``) a moment before its event is written, so readers only
+advance a cursor across a missing event once no append can still be in
+flight for it.
+
+A call is claimed per token with an atomic ``cache.add`` before it is
+appended, and the claim is only released when the token leaves in progress.
+Concurrent writers (the ``post_save`` callback and any number of display
+renders), later edits of an in-progress token, and a sub-queue with several
+in-progress tokens therefore never log the same call twice.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from token_display.settings import plugin_settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "token_display:events"
+
+# How long an append may take between reserving its sequence number and
+# writing the event. Missing events are only skipped once the latest append
+# started longer ago than this; until then they may still be in flight.
+APPEND_GRACE_S = 30
+
+
+def _seq_key(sub_queue_id: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:{sub_queue_id}:seq"
+
+
+def _event_key(sub_queue_id: str, seq: int) -> str:
+    return f"{CACHE_KEY_PREFIX}:{sub_queue_id}:{seq}"
+
+
+def _append_started_key(sub_queue_id: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:{sub_queue_id}:append_started"
+
+
+def _called_key(token_id: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:called:{token_id}"
+
+
+def get_heads(sub_queue_ids: list[str]) -> dict[str, int]:
+    """Latest sequence number per sub-queue (``0`` if nothing was logged)."""
+    found = cache.get_many([_seq_key(sq_id) for sq_id in sub_queue_ids])
+    return {sq_id: int(found.get(_seq_key(sq_id)) or 0) for sq_id in sub_queue_ids}
+
+
+def append_event(sub_queue_id: str, token_id: str, token_code: str) -> int:
+    """Log a token call and return its sequence number."""
+    key = _seq_key(sub_queue_id)
+    # Recorded before the sequence number becomes visible, so readers can
+    # tell a missing event that is still being written from a lost one.
+    cache.set(_append_started_key(sub_queue_id), time.time(), plugin_settings.ANNOUNCEMENT_LOG_TTL)
+    # The counter never expires so sequence numbers stay monotonic for as
+    # long as the cache keeps it.
+    cache.add(key, 0, timeout=None)
+    seq = cache.incr(key)
+    cache.set(
+        _event_key(sub_queue_id, seq),
+        {
+            "sub_queue_id": sub_queue_id,
+            "seq": seq,
+            "token_id": token_id,
+            "token_code": token_code,
+            "called_at": timezone.now().isoformat(),
+        },
+        plugin_settings.ANNOUNCEMENT_LOG_TTL,
+    )
+    return seq
+
+
+def record_token_call(sub_queue_id: str, token_id: str, token_code: str) -> int | None:
+    """
+    Log a token call unless this call of the token was already logged.
+
+    Returns the new sequence number, or ``None`` when nothing was logged.
+    """
+    key = _called_key(token_id)
+    if not cache.add(key, sub_queue_id, plugin_settings.ANNOUNCEMENT_LOG_TTL):
+        return None
+    try:
+        return append_event(sub_queue_id, token_id, token_code)
+    except Exception:
+        # Release the claim so a later save or render can log the call.
+        cache.delete(key)
+        raise
+
+
+def release_token_call(token_id: str) -> None:
+    """Allow the token to be logged again when it is next called (e.g. a recall)."""
+    cache.delete(_called_key(token_id))
+
+
+def get_events_after(sub_queue_id: str, cursor: int, head: int) -> tuple[list[dict], int, bool]:
+    """
+    Return the events with a sequence number above ``cursor``, oldest first,
+    the cursor the caller may advance to, and whether events were skipped.
+
+    The new cursor is the highest sequence number up to which every event has
+    been read (or is known to be lost), so an event that is still being
+    written is returned by a later call rather than skipped. Events that fell
+    out of the ring, expired, or are older than ``ANNOUNCEMENT_REPLAY_MAX_AGE``
+    count as skipped; the cursor still moves past them.
+
+    A cursor ahead of ``head`` means the log was reset (e.g. the cache was
+    flushed), so every retained event is treated as new.
+    """
+    if cursor > head:
+        cursor = 0
+    start = max(cursor + 1, head - plugin_settings.ANNOUNCEMENT_LOG_SIZE + 1)
+    seqs = range(start, head + 1)
+    found = cache.get_many([_event_key(sub_queue_id, seq) for seq in seqs])
+
+    append_started = cache.get(_append_started_key(sub_queue_id))
+    settled = append_started is None or time.time() - append_started > APPEND_GRACE_S
+    replay_after = timezone.now() - timedelta(seconds=plugin_settings.ANNOUNCEMENT_REPLAY_MAX_AGE)
+
+    events = []
+    new_cursor = start - 1
+    truncated = start > cursor + 1
+    for seq in seqs:
+        event = found.get(_event_key(sub_queue_id, seq))
+        if event is None:
+            if not settled:
+                break
+            truncated = True
+        elif datetime.fromisoformat(event["called_at"]) < replay_after:
+            truncated = True
+        else:
+            events.append(event)
+        new_cursor = seq
+    return events, new_cursor, truncated
+
+
+def _log_saved_token(token_pk) -> None:
+    """Deferred half of ``on_token_saved``; runs after the save commits."""
+    try:
+        from care.emr.models import Token
+        from care.emr.resources.scheduling.token.spec import TokenStatusOptions
+
+        from token_display.utils import fmt_token_number
+
+        token = Token.objects.select_related("queue", "sub_queue", "category").get(pk=token_pk)
+        # Re-check: a later save in the same transaction may have moved it on.
+        if token.status != TokenStatusOptions.IN_PROGRESS.value:
+            return
+        if token.sub_queue is None or not token.queue.is_primary:
+            return
+        record_token_call(
+            str(token.sub_queue.external_id),
+            str(token.external_id),
+            fmt_token_number(token),
+        )
+    except Exception:
+        logger.exception("Failed to log token call for token %s", token_pk)
+
+
+def _release_saved_token(token_id: str) -> None:
+    try:
+        release_token_call(token_id)
+    except Exception:
+        logger.exception("Failed to release token call for token %s", token_id)
+
+
+def on_token_saved(sender, instance, **kwargs) -> None:
+    """
+    ``post_save`` receiver for Care's ``Token`` model that logs a call when a
+    token moves to in progress, and releases the call once it moves on.
+
+    This runs inside every token save, so it only reads local fields and
+    defers all lookups and cache writes to a robust ``on_commit`` callback.
+    A plugin failure must never fail the token update.
+    """
+    try:
+        from care.emr.resources.scheduling.token.spec import TokenStatusOptions
+
+        if instance.status != TokenStatusOptions.IN_PROGRESS.value:
+            transaction.on_commit(partial(_release_saved_token, str(instance.external_id)), robust=True)
+        elif instance.sub_queue_id:
+            transaction.on_commit(partial(_log_saved_token, instance.pk), robust=True)
+    except Exception:
+        logger.exception("Failed to schedule token call logging for token %s", instance.pk)
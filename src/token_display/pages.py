@@ -1,11 +1,44 @@
 from django.urls import path
+from django.utils.module_loading import import_string
+
+
+def lazy_view(dotted_path: str, **initkwargs):
+    """
+    Return a view that imports the class-based view at ``dotted_path`` on
+    its first call.
+
+    The view modules import Care's models and DRF's renderers; resolving them
+    lazily keeps those imports off the worker boot path.
+    """
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    # Every routed view is a DRF APIView, which is CSRF-exempt and enforces
+    # CSRF itself for session-authenticated requests. Mirror that here since
+    # the middleware only sees this wrapper.
+    wrapper.csrf_exempt = True
+    return wrapper
 
-from token_display.views import SubQueuesTokenDisplayView
 
 urlpatterns = [
     path(
         "sub_queues/<str:sub_queue_external_ids>/",
-        SubQueuesTokenDisplayView.as_view(),
+        lazy_view("token_display.views.SubQueuesTokenDisplayView"),
         name="sub-queues-token-display",
     ),
+    path(
+        "sub_queues/<str:sub_queue_external_ids>/events/",
+        lazy_view("token_display.views.SubQueuesTokenEventsView"),
+        name="sub-queues-token-events",
+    ),
+    path(
+        "telemetry/",
+        lazy_view("token_display.views.DisplayTelemetryView"),
+        name="token-display-telemetry",
+    ),
 ]
@@ -106,6 +106,22 @@ DEFAULTS = {
     # sounds directory. Override via PLUGIN_CONFIGS or the `?va_lang=` query
     # parameter (comma-separated).
     "VA_DEFAULT_LANG": ["ml_IN", "en_IN"],
+    # Client-side performance telemetry. Displays batch timing samples to the
+    # telemetry endpoint; each display keeps its latest
+    # `TELEMETRY_BUFFER_SIZE` samples in the cache for `TELEMETRY_TTL`
+    # seconds, and at most `TELEMETRY_MAX_DISPLAYS` displays are tracked.
+    "TELEMETRY_ENABLED": True,
+    "TELEMETRY_BUFFER_SIZE": 200,
+    "TELEMETRY_MAX_DISPLAYS": 500,
+    "TELEMETRY_TTL": 24 * 60 * 60,
+    # Token-call event log backing announcement catch-up. Displays can catch
+    # up on at most the latest `ANNOUNCEMENT_LOG_SIZE` calls per sub-queue;
+    # each event is kept in the cache for `ANNOUNCEMENT_LOG_TTL` seconds.
+    "ANNOUNCEMENT_LOG_SIZE": 50,
+    "ANNOUNCEMENT_LOG_TTL": 24 * 60 * 60,
+    # Calls older than this many seconds are never replayed; a screen that
+    # was off for a while skips them instead of announcing stale tokens.
+    "ANNOUNCEMENT_REPLAY_MAX_AGE": 5 * 60,
 }
 
 plugin_settings = PluginSettings(
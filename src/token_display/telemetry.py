@@ -0,0 +1,160 @@
+"""
+Client-side performance telemetry for display screens.
+
+Display screens batch timing samples (page load, payload parse, event
+fetch, fragment fetch / decode, first audio start, queue timeouts) and post
+them here with ``navigator.sendBeacon``. Samples are kept in the Django
+cache as bounded per-display ring buffers, and fleet-wide percentiles are
+computed on read.
+
+The store is deliberately lossy: concurrent flushes from the same display
+may race on the read-modify-write of its buffer, and the least recently
+seen displays are evicted once ``TELEMETRY_MAX_DISPLAYS`` is reached. Each
+display keeps its own ``last_seen`` next to its samples, so the shared index
+of display ids is only rewritten when a display is new or its index entry has
+gone stale, not on every beacon.
+"""
+
+import math
+import re
+import time
+
+from django.core.cache import cache
+
+from token_display.settings import plugin_settings
+
+CACHE_KEY_PREFIX = "token_display:telemetry"
+DISPLAY_INDEX_KEY = f"{CACHE_KEY_PREFIX}:displays"
+
+# Metric names accepted from clients. Anything else is dropped on ingest so
+# a misbehaving screen can't grow the aggregate with arbitrary keys.
+METRICS = {
+    "page_load",
+    "payload_parse",
+    "events_fetch",
+    "events_truncated",
+    "fragment_fetch",
+    "fragment_decode",
+    "first_audio",
+    "queue_timeout",
+}
+
+# Metrics that mark an occurrence rather than a duration. They are reported
+# as counts; their values carry no timing information.
+COUNT_METRICS = {"events_truncated", "queue_timeout"}
+
+PERCENTILES = (50, 90, 99)
+
+# Upper bound for a single sample (ms). Anything above is clamped rather than
+# dropped so pathological screens still show up in the tail.
+MAX_SAMPLE_MS = 10 * 60 * 1000
+
+# How stale a display's entry in the shared index may get before a beacon
+# rewrites it. Keeps index writes rare while still evicting idle displays.
+INDEX_REFRESH_S = 15 * 60
+
+_DISPLAY_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def _buffer_key(display_id: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:display:{display_id}"
+
+
+def is_valid_display_id(display_id) -> bool:
+    return isinstance(display_id, str) and bool(_DISPLAY_ID_RE.match(display_id))
+
+
+def clean_samples(events) -> list[tuple[str, float]]:
+    """Validate a client batch, returning ``(metric, value_ms)`` pairs.
+
+    Unknown metrics, non-numeric and negative values are silently dropped.
+    """
+    if not isinstance(events, list):
+        return []
+    samples = []
+    for event in events:
+        if not isinstance(event, dict):
+            continue
+        name = event.get("name")
+        value = event.get("value")
+        if name not in METRICS or isinstance(value, bool):
+            continue
+        if not isinstance(value, int | float) or not math.isfinite(value) or value < 0:
+            continue
+        samples.append((name, float(min(value, MAX_SAMPLE_MS))))
+    return samples
+
+
+def record_samples(display_id: str, samples: list[tuple[str, float]]) -> None:
+    """Append samples to the display's ring buffer and touch the index."""
+    if not samples:
+        return
+    now = time.time()
+    buffer_size = plugin_settings.TELEMETRY_BUFFER_SIZE
+    ttl = plugin_settings.TELEMETRY_TTL
+
+    key = _buffer_key(display_id)
+    buffer = cache.get(key) or {}
+    entries = buffer.get("samples", [])
+    entries.extend([now, name, value] for name, value in samples)
+    cache.set(key, {"last_seen": now, "samples": entries[-buffer_size:]}, ttl)
+
+    index = cache.get(DISPLAY_INDEX_KEY) or {}
+    if now - index.get(display_id, 0) < INDEX_REFRESH_S:
+        return
+    index[display_id] = now
+    max_displays = plugin_settings.TELEMETRY_MAX_DISPLAYS
+    if len(index) > max_displays:
+        keep = sorted(index, key=index.get, reverse=True)[:max_displays]
+        cache.delete_many([_buffer_key(d) for d in index if d not in keep])
+        index = {d: index[d] for d in keep}
+    cache.set(DISPLAY_INDEX_KEY, index, ttl)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(name: str, values: list[float]) -> dict:
+    if name in COUNT_METRICS:
+        return {"count": len(values)}
+    values = sorted(values)
+    summary = {"count": len(values)}
+    for pct in PERCENTILES:
+        summary[f"p{pct}"] = round(percentile(values, pct), 1)
+    return summary
+
+
+def _group_by_metric(entries) -> dict[str, list[float]]:
+    grouped = {}
+    for _, name, value in entries:
+        grouped.setdefault(name, []).append(value)
+    return grouped
+
+
+def fleet_summary() -> dict:
+    """
+    Percentiles per timing metric (counts for occurrence metrics such as
+    ``queue_timeout``), across the fleet and per display.
+    """
+    index = cache.get(DISPLAY_INDEX_KEY) or {}
+    found = cache.get_many([_buffer_key(d) for d in index])
+    buffers = {d: found[_buffer_key(d)] for d in index if found.get(_buffer_key(d))}
+
+    fleet = {}
+    displays = {}
+    for display_id, buffer in sorted(buffers.items(), key=lambda item: item[1]["last_seen"], reverse=True):
+        grouped = _group_by_metric(buffer["samples"])
+        for name, values in grouped.items():
+            fleet.setdefault(name, []).extend(values)
+        displays[display_id] = {
+            "last_seen": buffer["last_seen"],
+            "metrics": {name: summarize(name, values) for name, values in grouped.items()},
+        }
+
+    return {
+        "fleet": {name: summarize(name, values) for name, values in fleet.items()},
+        "displays": displays,
+    }
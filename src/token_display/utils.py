@@ -1,15 +1,19 @@
-from care.emr.models import Token
-from care.emr.models.scheduling.schedule import SchedulableResource
-from care.emr.resources.scheduling.schedule.spec import SchedulableResourceTypeOptions
-from care.users.models import User
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from care.emr.models import Token
+    from care.emr.models.scheduling.schedule import SchedulableResource
+    from care.users.models import User
 
-def fmt_user_name(obj: User) -> str:
+
+def fmt_user_name(obj: "User") -> str:
     parts = [obj.prefix, obj.first_name, obj.last_name, obj.suffix]
     return " ".join(filter(None, parts))
 
 
-def fmt_schedule_resource_name(obj: SchedulableResource) -> str:
+def fmt_schedule_resource_name(obj: "SchedulableResource") -> str:
+    from care.emr.resources.scheduling.schedule.spec import SchedulableResourceTypeOptions
+
     if obj.resource_type == SchedulableResourceTypeOptions.practitioner.value:
         return fmt_user_name(obj.user)
     if obj.resource_type == SchedulableResourceTypeOptions.healthcare_service.value:
@@ -19,5 +23,5 @@ def fmt_schedule_resource_name(obj: SchedulableResource) -> str:
     raise ValueError("Invalid resource type")
 
 
-def fmt_token_number(token: Token) -> str:
+def fmt_token_number(token: "Token") -> str:
     return f"{token.category.shorthand}-{token.number:03d}"
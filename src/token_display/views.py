@@ -1,4 +1,7 @@
+import json
+import logging
 import re
+from urllib.parse import urlencode
 
 from care.emr.models import Token, TokenSubQueue
 from care.emr.resources.scheduling.token.spec import TokenStatusOptions
@@ -7,20 +10,31 @@ from care.emr.resources.scheduling.token_sub_queue.spec import (
 )
 from care.security.authorization import AuthorizationController
 from django.db.models import Exists, OuterRef
+from django.urls import reverse
 from django.utils import timezone
 from django.utils.timezone import make_naive
-from rest_framework.exceptions import PermissionDenied
-from rest_framework.renderers import TemplateHTMLRenderer
+from rest_framework.exceptions import ParseError, PermissionDenied, ValidationError
+from rest_framework.renderers import JSONRenderer, TemplateHTMLRenderer
 from rest_framework.response import Response
+from rest_framework.status import HTTP_204_NO_CONTENT
 from rest_framework.views import APIView
 
 from token_display.authentication import QueryParamTokenAuthentication
+from token_display.events import get_events_after, get_heads, record_token_call
 from token_display.settings import plugin_settings
+from token_display.telemetry import (
+    clean_samples,
+    fleet_summary,
+    is_valid_display_id,
+    record_samples,
+)
 from token_display.utils import (
     fmt_schedule_resource_name,
     fmt_token_number,
 )
 
+logger = logging.getLogger(__name__)
+
 TRUTHY_QUERY_VALUES = {"1", "true", "yes"}
 
 # A `prefix-<lang>.wav` fragment must exist for each accepted lang code.
@@ -50,14 +64,43 @@ def _parse_va_lang_query_param(value: str | None) -> list[str] | None:
     return [p for p in parts if _VA_LANG_RE.match(p)]
 
 
-class SubQueuesTokenDisplayView(APIView):
+def _parse_cursor_query_param(value: str | None) -> dict[str, int]:
+    """Parse an ``?after=<sub_queue_id>:<seq>,...`` value.
+
+    Malformed entries are silently dropped; a sub-queue without a cursor is
+    treated as caught up by the caller.
     """
-    Main view that renders the full SSR token display page for a facility.
+    cursors = {}
+    for part in (value or "").split(","):
+        sub_queue_id, _, seq = part.strip().rpartition(":")
+        # `isdecimal` rather than `isdigit`, which also accepts characters
+        # such as "²" that `int()` rejects.
+        if sub_queue_id and seq.isdecimal():
+            cursors[sub_queue_id] = int(seq)
+    return cursors
+
+
+def _authenticated_url(request, view_name: str, **kwargs) -> str:
+    """Reverse ``view_name``, carrying over the ``?token=`` query parameter.
+
+    Display screens authenticate with a query-param token, so any URL the
+    page calls back into (e.g. via ``navigator.sendBeacon``, which can't set
+    headers) needs the same token appended.
+    """
+    url = reverse(view_name, kwargs=kwargs or None)
+    token = request.query_params.get("token")
+    if token:
+        url = f"{url}?{urlencode({'token': token})}"
+    return url
+
+
+class BaseSubQueuesView(APIView):
+    """
+    Common lookup and authorization for views addressed by a comma-separated
+    list of sub-queue external ids.
     """
 
     authentication_classes = [QueryParamTokenAuthentication]
-    renderer_classes = [TemplateHTMLRenderer]
-    template_name = "token_display/display.html"
 
     def get_sub_queue_objects(self, only_with_active_tokens: bool = False):
         external_ids = self.kwargs["sub_queue_external_ids"].split(",")
@@ -95,6 +138,15 @@ class SubQueuesTokenDisplayView(APIView):
                     "You do not have permission read tokens for this resource"
                 )
 
+
+class SubQueuesTokenDisplayView(BaseSubQueuesView):
+    """
+    Main view that renders the full SSR token display page for a facility.
+    """
+
+    renderer_classes = [TemplateHTMLRenderer]
+    template_name = "token_display/display.html"
+
     def get(self, request, sub_queue_external_ids: str):
         """
         Render the full token display page with static data.
@@ -155,6 +207,14 @@ class SubQueuesTokenDisplayView(APIView):
             )
 
             token_code = fmt_token_number(token) if token else None
+            if token:
+                # Catch calls the post_save receiver can't see (e.g. bulk
+                # updates); a no-op when the token is already logged. The
+                # board must still render if the cache is unavailable.
+                try:
+                    record_token_call(str(sub_queue.external_id), str(token.external_id), token_code)
+                except Exception:
+                    logger.exception("Failed to log token call for token %s", token.external_id)
 
             upcoming_tokens_qs = Token.objects.filter(
                 queue__resource=sub_queue.resource,
@@ -181,17 +241,42 @@ class SubQueuesTokenDisplayView(APIView):
         # When no announcement languages are configured, suppress the
         # announcer markup entirely and let the static <meta refresh>
         # fallback (rendered in the template) drive page reloads.
-        announcement_payload = (
-            None
-            if not va_langs
-            else {
-                "sub_queues": [
-                    {"id": entry["id"], "token_code": entry["token_code"]}
-                    for entry in sub_queues_with_data
-                ],
+        announcement_payload = None
+        heads = None
+        if va_langs:
+            # Cover every requested sub-queue, not just those on the board, so
+            # a screen keeps its cursor while `only_with_active_tokens` hides a
+            # sub-queue and still announces calls made as it reappears.
+            all_sub_queues = self.get_sub_queue_objects() if only_with_active_tokens else sub_queues
+            sub_queue_ids = [str(sq.external_id) for sq in all_sub_queues]
+            try:
+                heads = get_heads(sub_queue_ids)
+            except Exception:
+                # Without the event log, render the board without the
+                # announcer; the <meta refresh> fallback keeps it updating.
+                logger.exception("Failed to read announcement log heads")
+        if heads is not None:
+            announcement_payload = {
+                "sub_queues": [{"id": sub_queue_id, "seq": heads[sub_queue_id]} for sub_queue_id in sub_queue_ids],
+                "events_url": _authenticated_url(
+                    request,
+                    "sub-queues-token-events",
+                    sub_queue_external_ids=sub_queue_external_ids,
+                ),
                 "langs": va_langs,
                 "auto_refresh_interval": plugin_settings.AUTO_REFRESH_INTERVAL,
             }
+
+        # Operators may label a screen with `?display_id=`; otherwise the
+        # page generates and persists a random id on first load.
+        display_id = request.query_params.get("display_id")
+        telemetry_config = (
+            {
+                "url": _authenticated_url(request, "token-display-telemetry"),
+                "display_id": display_id if is_valid_display_id(display_id) else None,
+            }
+            if plugin_settings.TELEMETRY_ENABLED
+            else None
         )
 
         return Response(
@@ -202,5 +287,85 @@ class SubQueuesTokenDisplayView(APIView):
                 "grid_class": grid_class,
                 "only_with_active_tokens": only_with_active_tokens,
                 "announcement_payload": announcement_payload,
+                "telemetry_config": telemetry_config,
             }
         )
+
+
+class SubQueuesTokenEventsView(BaseSubQueuesView):
+    """
+    Token-call events after each display's cursor, for announcement catch-up.
+    """
+
+    renderer_classes = [JSONRenderer]
+
+    def get(self, request, sub_queue_external_ids: str):
+        """
+        Return the calls logged after ``?after=<sub_queue_id>:<seq>,...``.
+
+        Events are ordered by call time. ``cursors`` holds, for each
+        sub-queue in ``after``, the sequence number the display may advance
+        to; it stops short of events that are still being written. ``truncated``
+        lists sub-queues with calls that could not be replayed.
+        """
+        self.authorize_request()
+        sub_queue_ids = [str(sq.external_id) for sq in self.get_sub_queue_objects()]
+        after = _parse_cursor_query_param(request.query_params.get("after"))
+        heads = get_heads(sub_queue_ids)
+
+        events = []
+        cursors = {}
+        truncated = []
+        for sub_queue_id in sub_queue_ids:
+            if sub_queue_id not in after:
+                continue
+            sub_queue_events, cursors[sub_queue_id], is_truncated = get_events_after(
+                sub_queue_id, after[sub_queue_id], heads[sub_queue_id]
+            )
+            events.extend(sub_queue_events)
+            if is_truncated:
+                truncated.append(sub_queue_id)
+        events.sort(key=lambda event: event["called_at"])
+
+        return Response({"events": events, "cursors": cursors, "truncated": truncated})
+
+
+class DisplayTelemetryView(APIView):
+    """
+    Collects batched timing samples from display screens and exposes
+    fleet-wide percentiles.
+    """
+
+    authentication_classes = [QueryParamTokenAuthentication]
+    renderer_classes = [JSONRenderer]
+    # `navigator.sendBeacon` posts strings as `text/plain`, so the body is
+    # decoded by hand rather than through DRF's content negotiation.
+    parser_classes = []
+
+    def post(self, request):
+        """
+        Record a batch of samples: ``{"display_id": str, "events": [{"name": str, "value": ms}]}``.
+        """
+        if not plugin_settings.TELEMETRY_ENABLED:
+            return Response(status=HTTP_204_NO_CONTENT)
+        try:
+            body = json.loads(request.body or b"{}")
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ParseError("Invalid telemetry payload") from e
+        if not isinstance(body, dict):
+            raise ParseError("Invalid telemetry payload")
+
+        display_id = body.get("display_id")
+        if not is_valid_display_id(display_id):
+            raise ValidationError({"display_id": "Invalid display id"})
+
+        record_samples(display_id, clean_samples(body.get("events")))
+        return Response(status=HTTP_204_NO_CONTENT)
+
+    def get(self, request):
+        """
+        Return p50/p90/p99 per metric, across the fleet and per display.
+        """
+        if not request.user.is_superuser:
+            raise PermissionDenied("You do not have permission to view display telemetry")
+        return Response(fleet_summary())